@@ -3,12 +3,24 @@
 
 from __future__ import print_function
 from __future__ import unicode_literals
+import re
+import atexit
+import logging
+import select
 import socket
 import json
+import time
+import functools
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import paramiko
 from napalm.base import constants as c
+from napalm.base.exceptions import CommandTimeoutException
 from netmiko import ConnectHandler
 from napalm.base.base import NetworkDriver
 
+log = logging.getLogger(__name__)
 
 # Easier to store these as constants
 SECONDS = 1
@@ -18,6 +30,117 @@ DAY_SECONDS = 24 * HOUR_SECONDS
 WEEK_SECONDS = 7 * DAY_SECONDS
 YEAR_SECONDS = 365 * DAY_SECONDS
 
+# 'show version' lines, e.g. "ArubaOS (MODEL: 505), Version 8.6.0.4" and
+# "AP uptime is 2 weeks 2 days 5 hours 11 minutes 29 seconds"
+_MODEL_RE = re.compile(r"^([^,\n]*MODEL[^,\n]*),([^\n]*)$", re.M)
+_UPTIME_RE = re.compile(r"AP uptime is([^\r\n]*)")
+# Each "<count> <unit>" of the uptime line, any of the units may be missing
+_UPTIME_UNIT_RE = re.compile(r"(\d+)\s+(week|day|hour|minute|second)s?")
+_UPTIME_UNIT_SECONDS = {
+    'week': WEEK_SECONDS,
+    'day': DAY_SECONDS,
+    'hour': HOUR_SECONDS,
+    'minute': MINUTE_SECONDS,
+    'second': SECONDS,
+}
+
+# 'show summary' lines, e.g. "Serial Number    :CNKJ123"
+_SUMMARY_RE = re.compile(r"^[ \t]*(?P<name>Name|DNSDomain|Serial Number)[ \t]*:[ \t]*(?P<val>[^\r\n]*)\r?$",
+                         re.M)
+
+# Any of these in the 'ping' output means the device is not reachable
+_BAD_PING_RE = re.compile(r"not known|[Ee]rror|[Ff]ail|Unreachable|estination|reachable|connect")
+
+# 'show ap debug lldp neighbor' fields, e.g. "Interface description: 1/1/12, Port id: 12"
+_LLDP_SYSNAME_RE = re.compile(r"System name:[ \t]*(\S+)")
+_LLDP_IFDESC_RE = re.compile(r"Interface description:[ \t]*([^,\s]+)")
+
+# Netmiko possible arguments
+_NETMIKO_OPTIONAL_ARGS = frozenset({
+    'port',
+    'secret',
+    'verbose',
+    'keepalive',
+    'global_delay_factor',
+    'use_keys',
+    'key_file',
+    'ssh_strict',
+    'system_host_keys',
+    'alt_host_keys',
+    'alt_key_file',
+    'ssh_config_file',
+    'allow_agent',
+})
+
+# Seconds to wait after a bare prompt for the CLI to echo the next batched command
+_TYPEAHEAD_WAIT = 3
+
+# Netmiko sessions shared by the drivers talking to the same device,
+# keyed on (hostname, port, username, digest of the password and netmiko args).
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class _PooledSession:
+    """A netmiko session and the drivers currently using it."""
+
+    def __init__(self, device, idle_timeout):
+        self.device = device
+        self.refs = 1
+        # Disconnects the session once no driver used it for idle_timeout seconds
+        self.idle_timeout = idle_timeout
+        self.idle_timer = None
+        # Cleared once the device drops commands sent ahead of its prompt
+        self.batch_commands = True
+        # Held for every command exchange, drivers may share the channel across threads
+        self.lock = threading.RLock()
+
+    def acquire(self):
+        """Adds a user, called with _SESSIONS_LOCK held."""
+        self.refs += 1
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+
+def _strip_empty_lines(text):
+    """Returns the text without its blank lines, each line ending with a newline."""
+    return "\n".join(line for line in text.splitlines() if line.strip()) + "\n"
+
+
+def _disconnect(device):
+    """Disconnects a netmiko session, ignoring a connection that is already gone."""
+    try:
+        device.disconnect()
+    except (socket.error, EOFError):
+        pass
+
+
+def close_pool():
+    """Disconnect every pooled session, whether or not a driver still uses it."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        if session.idle_timer is not None:
+            session.idle_timer.cancel()
+        _disconnect(session.device)
+
+
+# Pooled sessions would otherwise stay open on the AP when the interpreter exits
+atexit.register(close_pool)
+
+
+def _reap_session(key, session):
+    """Disconnects a pooled session if no driver reopened it while it was idle."""
+    with _SESSIONS_LOCK:
+        # A timer cancelled after it fired is no longer the session's idle_timer
+        if (_SESSIONS.get(key) is not session or session.refs > 0
+                or session.idle_timer is not threading.current_thread()):
+            return
+        del _SESSIONS[key]
+    log.debug("Closing the idle session to %s:%s", key[0], key[1])
+    _disconnect(session.device)
 
 
 class ArubaFDriver(NetworkDriver):
@@ -34,30 +157,18 @@ class ArubaFDriver(NetworkDriver):
 
         self.transport = optional_args.get('transport', 'ssh')
 
-        # Netmiko possible arguments
-        netmiko_argument_map = {
-            'port': None,
-            'secret': '',
-            'verbose': False,
-            'keepalive': 30,
-            'global_delay_factor': 1,
-            'use_keys': False,
-            'key_file': None,
-            'ssh_strict': False,
-            'system_host_keys': False,
-            'alt_host_keys': False,
-            'alt_key_file': '',
-            'ssh_config_file': None,
-            'allow_agent': False,
-        }
+        # get_facts results are reused for 'facts_ttl' seconds
+        self._facts_ttl = optional_args.get('facts_ttl', 30)
+        self._facts_cache = None
+        # LLDP neighbors are reused for 'lldp_ttl' seconds
+        self._lldp_ttl = optional_args.get('lldp_ttl', 15)
+        self._lldp_cache = None
+        # Run get_facts commands concurrently on their own SSH exec channels
+        self._exec_channels = optional_args.get('exec_channels', False)
 
         # Build dict of any optional Netmiko args
-        self.netmiko_optional_args = {}
-        for k, v in netmiko_argument_map.items():
-            try:
-                self.netmiko_optional_args[k] = optional_args[k]
-            except KeyError:
-                pass
+        self.netmiko_optional_args = {k: optional_args[k]
+                                      for k in _NETMIKO_OPTIONAL_ARGS & optional_args.keys()}
 
         default_port = {
             'ssh': 22,
@@ -66,6 +177,15 @@ class ArubaFDriver(NetworkDriver):
         self.port = optional_args.get('port', default_port[self.transport])
 
         self.device = None
+        self._session = None
+        # A driver with other credentials must never pick up a session it couldn't have opened
+        credentials = repr((self.password, sorted(self.netmiko_optional_args.items())))
+        self._session_key = (self.hostname, self.port, self.username,
+                             hashlib.sha256(credentials.encode("utf-8")).hexdigest())
+        # Replaced by the pooled session's lock on open()
+        self._channel_lock = threading.RLock()
+        # Seconds a session opened by this driver stays pooled after the last close()
+        self._session_idle_timeout = optional_args.get('session_idle_timeout', 60)
         self.config_replace = False
         self.interface_map = {}
         self.profile = ["ArubaOS"]
@@ -73,20 +193,107 @@ class ArubaFDriver(NetworkDriver):
     def open(self):
         """Open a connection to the device."""
 
+        self._clear_caches()
         device_type = 'aruba_os'
         if self.transport == 'ssh':
             device_type = 'aruba_os'
-        self.device = ConnectHandler(device_type=device_type,
-                                     host=self.hostname,
-                                     username=self.username,
-                                     password=self.password,
-                                     **self.netmiko_optional_args)
+
+        # Reuse a session opened by another driver for the same device. It is
+        # probed outside of _SESSIONS_LOCK so a slow device doesn't block the pool.
+        with _SESSIONS_LOCK:
+            stale = _SESSIONS.get(self._session_key)
+            if stale is not None:
+                stale.acquire()
+        if stale is not None:
+            with stale.lock:
+                alive = stale.device.is_alive()
+            if alive:
+                self._use_session(stale)
+                log.debug("Reusing the session to %s:%s", self.hostname, self.port)
+                return
+            self._release_session(stale, keep_idle=False)
+
+        device = ConnectHandler(device_type=device_type,
+                                host=self.hostname,
+                                username=self.username,
+                                password=self.password,
+                                **self.netmiko_optional_args)
+        self._enable_keepalive(device)
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(self._session_key)
+            if session is not None and session is not stale:
+                # Another driver connected in the meantime, keep its session
+                session.acquire()
+            else:
+                session = _SESSIONS[self._session_key] = _PooledSession(device, self._session_idle_timeout)
+                device = None
+        if device is not None:
+            _disconnect(device)
+        self._use_session(session)
+        log.debug("Opened a session to %s:%s", self.hostname, self.port)
         # ensure in enable mode
         ## self.device.enable()
 
+    def _enable_keepalive(self, device):
+        """Keeps an idle session from being dropped by NAT and firewall timeouts."""
+        interval = self.netmiko_optional_args.get('keepalive', 15)
+        if not interval:
+            # keepalive=0 turns them off
+            return
+        transport = device.remote_conn.transport
+        if 'keepalive' not in self.netmiko_optional_args:
+            # netmiko already set the SSH keepalive it was given
+            transport.set_keepalive(interval)
+
+        # The transport may run over a proxy command instead of a real socket
+        sock = transport.sock
+        if not isinstance(sock, socket.socket):
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in (('TCP_KEEPIDLE', interval), ('TCP_KEEPINTVL', interval), ('TCP_KEEPCNT', 4)):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
     def close(self):
         """Close the connection to the device."""
-        self.device.disconnect()
+        self._clear_caches()
+        if self._session is None:
+            # Never opened or already closed
+            return
+        session = self._session
+        self._session = None
+        self.device = None
+        self._release_session(session)
+
+    def _use_session(self, session):
+        """Makes the driver send its commands over the pooled session."""
+        self._session = session
+        self._channel_lock = session.lock
+        self.device = session.device
+
+    def _release_session(self, session, keep_idle=True):
+        """ Drops the driver's use of a pooled session.
+        The last user disconnects it, after the session's idle_timeout unless keep_idle is False
+        """
+        with _SESSIONS_LOCK:
+            session.refs -= 1
+            if session.refs > 0:
+                return
+            if _SESSIONS.get(self._session_key) is session:
+                if keep_idle and session.idle_timeout > 0:
+                    session.idle_timer = threading.Timer(session.idle_timeout, _reap_session,
+                                                         (self._session_key, session))
+                    session.idle_timer.daemon = True
+                    session.idle_timer.start()
+                    return
+                del _SESSIONS[self._session_key]
+        log.debug("Closing the session to %s:%s", self.hostname, self.port)
+        _disconnect(session.device)
+
+    def _clear_caches(self):
+        """Forget the cached facts and LLDP neighbors."""
+        self._facts_cache = None
+        self._lldp_cache = None
 
     def is_alive(self):
         """Returns a flag with the state of the connection."""
@@ -97,13 +304,130 @@ class ArubaFDriver(NetworkDriver):
             # SSH
             try:
                 # Try sending ASCII null byte to maintain the connection alive
-                self.device.write_channel(null)
+                with self._channel_lock:
+                    self.device.write_channel(null)
                 return {'is_alive': self.device.remote_conn.transport.is_active()}
             except (socket.error, EOFError):
                 # If unable to send, we can tell for sure that the connection is unusable
                 return {'is_alive': False}
         ## return {'is_alive': False}
 
+    def _send_command(self, command):
+        """ Sends a single command and reads until the device prompt comes back.
+        Passing the prompt as expect_string saves netmiko's find_prompt() round-trip
+        and its delay before every command.
+        """
+        prompt = r"{}[#>]\s*$".format(re.escape(self.device.base_prompt))
+        log.debug("Sending %r to %s", command, self.hostname)
+        with self._channel_lock:
+            return self.device.send_command(command, expect_string=prompt)
+
+    def _send_commands(self, commands):
+        """ Sends all the commands in a single write and reads the channel once.
+        Falls back to one _send_command() per command if the CLI drops the type-ahead
+        :returns a list with the output of each command, in the same order
+        """
+
+        session = self._session
+        outputs = []
+        if session.batch_commands:
+            outputs = self._send_batch(commands)
+            if len(outputs) < len(commands):
+                log.debug("%s dropped batched commands, sending the rest one by one", self.hostname)
+                # Don't batch again on this session
+                session.batch_commands = False
+        return outputs + [self._send_command(command) for command in commands[len(outputs):]]
+
+    def _send_batch(self, commands):
+        """ Writes all the commands at once and reads until one prompt per command came back.
+        Stops early if the CLI doesn't echo the next command shortly after a bare prompt
+        :returns a list with the output of each command answered, in the same order
+        """
+
+        # A prompt line, either bare or followed by the echo of the next command
+        base_prompt = self.device.base_prompt.encode("utf-8")
+        prompt_re = re.compile(rb"^" + re.escape(base_prompt) + rb"[#>].*$", re.M)
+
+        log.debug("Sending %r to %s", commands, self.hostname)
+        with self._channel_lock:
+            self.device.clear_buffer()
+            self.device.write_channel("\n".join(commands) + "\n")
+
+            # Read the raw bytes as they come, the output is only decoded once complete.
+            # Reading the paramiko channel directly bypasses netmiko's session_log.
+            channel = self.device.remote_conn
+            buf = bytearray()
+            prompts = 0
+            scan_from = 0
+            last_prompt = None
+            deadline = time.monotonic() + self.timeout
+            while prompts < len(commands):
+                # Nothing after the last prompt, the next command should be echoed right away
+                bare_prompt = (last_prompt is not None
+                               and len(buf[last_prompt:].rstrip()) == len(base_prompt) + 1)
+                wait_until = deadline
+                if bare_prompt:
+                    wait_until = min(deadline, time.monotonic() + _TYPEAHEAD_WAIT)
+                remaining = wait_until - time.monotonic()
+                readable = select.select([channel], [], [], remaining)[0] if remaining > 0 else []
+                if not readable:
+                    if bare_prompt and wait_until < deadline:
+                        # The CLI dropped the rest of the type-ahead
+                        break
+                    raise CommandTimeoutException(
+                        "Timed out waiting for the prompt after {}".format(commands))
+                chunk = channel.recv(65536)
+                if not chunk:
+                    raise EOFError("Channel closed while waiting for the prompt after {}".format(commands))
+                buf += chunk
+
+                # Only look at the new data, plus the line it completes
+                for match in prompt_re.finditer(buf, scan_from):
+                    prompts += 1
+                    scan_from = match.end()
+                    last_prompt = match.start()
+                scan_from = max(scan_from, buf.rfind(b"\n") + 1)
+
+        outputs = []
+        for command, part in zip(commands, prompt_re.split(bytes(buf))[:prompts]):
+            output = self.device.normalize_linefeeds(part.decode("utf-8", errors="replace"))
+            outputs.append(self.device.strip_command(command, output))
+        return outputs
+
+    def _exec_command(self, command):
+        """ Runs a command on a new SSH exec channel of the session transport
+        :returns the command output
+        """
+
+        channel = self.device.remote_conn.get_transport().open_session(timeout=self.timeout)
+        try:
+            channel.settimeout(self.timeout)
+            channel.exec_command(command)
+            output = channel.makefile("rb").read()
+            error = channel.makefile_stderr("rb").read()
+            status = channel.recv_exit_status()
+        finally:
+            channel.close()
+        # Some APs accept the exec request but answer with an error or nothing at all
+        if status != 0 or not output.strip():
+            raise paramiko.SSHException("{!r} exited with status {}: {!r}".format(command, status, error))
+        return self.device.normalize_linefeeds(output.decode("utf-8", errors="replace"))
+
+    def _exec_commands(self, commands):
+        """ Runs all the commands at once, each on its own SSH exec channel.
+        Falls back to _send_commands() if the device refuses the extra channels
+        :returns a list with the output of each command, in the same order
+        """
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+                return list(executor.map(self._exec_command, commands))
+        except (paramiko.SSHException, socket.error, EOFError) as e:
+            log.debug("%s refused exec channels, using the shell instead: %s", self.hostname, e)
+            # Don't try again for this driver
+            self._exec_channels = False
+            return self._send_commands(commands)
+
     def get_config(self, retrieve="all", full=False, sanitized=False):
         """
         Get config from device.
@@ -117,25 +441,18 @@ class ArubaFDriver(NetworkDriver):
             "candidate": "No Candidate"
         }
 
+        # Only the running config is read from the device
         if retrieve.lower() in ('running', 'all'):
             command = "show running-config"
-            output = self.device.send_command(command)
+            output = self._send_command(command)
             if output:
-                configs['running'] = output
-                data = str(configs['running']).split("\n")
-                non_empty_lines = [line for line in data if line.strip() != ""]
-
-                string_without_empty_lines = ""
-                for line in non_empty_lines:
-                    string_without_empty_lines += line + "\n"
-                configs['running'] = string_without_empty_lines
-
-        if retrieve.lower() in ('startup', 'all'):
-            pass
+                configs['running'] = _strip_empty_lines(output)
         return configs
 
 
-    def show_summary_sanitizer(self, data):
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def show_summary_sanitizer(data):
         """ Collects the fqdn and the serial number from the 'show summary'
         :returns a tuple with two values (hostname, fqdn, serial_number)
         """
@@ -145,79 +462,64 @@ class ArubaFDriver(NetworkDriver):
         hostname_ = ""
 
         if data:
-            data_l = data.strip().splitlines()
-
-            for l in data_l:
-                if "Name" in l and not hostname_:
-                    hostname_ = f"{l.split(':')[1].lower()}"
-                if "DNSDomain" in l and hostname_:
-                    fqdn = f"{hostname_}.{l.split(':')[1]}"
-                if "Serial Number" in l :
-                    serial_number = l.split(':')[1]
+            # First value seen for each of the keywords
+            fields = {}
+            for match in _SUMMARY_RE.finditer(data):
+                fields.setdefault(match.group('name'), match.group('val').strip())
+
+            hostname_ = fields.get("Name", "").lower()
+            serial_number = fields.get("Serial Number", "")
+            if hostname_ and fields.get("DNSDomain"):
+                fqdn = f"{hostname_}.{fields['DNSDomain']}"
         return hostname_, fqdn, serial_number
 
 
-    def show_version_sanitizer(self, data):
+    @staticmethod
+    def show_version_sanitizer(data):
         """ Collects the vendor, model, os version and uptime from the 'show version'
         :returns a tuple with two values (vendor, model, os version, uptime)
         """
 
-        # Initialize to zero
-        (years, weeks, days, hours, minutes, seconds) = (0, 0, 0, 0, 0, 0)
-
         vendor = "Hewlett Packard"
         model = ""
         os_version = ""
         uptime = ""
 
         if data:
-            data_l = data.strip().splitlines()
-            for l in data_l:
-                if "MODEL" in l:
-                    model, os_version = l.split(',')
-                if "AP uptime is" in l:
-                    tmp_uptime = l.replace("AP uptime is", "").split()
-                    uptimes_records = [int(i) for i in tmp_uptime if i.isnumeric()]
-
-                    if uptimes_records and len(uptimes_records) >= 5:
-                        weeks, days, hours, minutes, seconds = uptimes_records
-                        uptime = float(sum([(years * YEAR_SECONDS), (weeks * WEEK_SECONDS), (days * DAY_SECONDS),
-                                            (hours * HOUR_SECONDS), (minutes * MINUTE_SECONDS), (seconds * SECONDS), ]))
-                    if uptimes_records and len(uptimes_records) == 4:
-                        weeks, days, hours, minutes = uptimes_records
-                        uptime = float(sum([(years * YEAR_SECONDS), (weeks * WEEK_SECONDS), (days * DAY_SECONDS),
-                                            (hours * HOUR_SECONDS), (minutes * MINUTE_SECONDS), (seconds * SECONDS), ]))
+            model_match = _MODEL_RE.search(data)
+            if model_match:
+                model, os_version = model_match.groups()
+
+            uptime_match = _UPTIME_RE.search(data)
+            if uptime_match:
+                uptime = float(sum(int(count) * _UPTIME_UNIT_SECONDS[unit]
+                                   for count, unit in _UPTIME_UNIT_RE.findall(uptime_match.group(1))))
 
         return vendor, model, os_version, uptime
 
     def get_facts(self):
         """Return a set of facts from the devices"""
 
-        configs = {}
-        show_version_output = self.device.send_command("show version")
-        show_summary_output = self.device.send_command("show summary")
+        if self._facts_cache is not None:
+            cached_at, facts = self._facts_cache
+            if time.monotonic() - cached_at < self._facts_ttl:
+                return dict(facts)
 
-        # processing 'show version' output
-        configs['show_version'] = show_version_output
-        show_version_data = str(configs['show_version']).split("\n")
-        show_version_non_empty_lines = [line for line in show_version_data if line.strip() != ""]
+        commands = ["show version", "show summary"]
+        if self._exec_channels:
+            show_version_output, show_summary_output = self._exec_commands(commands)
+        else:
+            show_version_output, show_summary_output = self._send_commands(commands)
 
-        show_version_string_ = ""
-        for line in show_version_non_empty_lines:
-            show_version_string_ += line + "\n"
+        # processing 'show version' output
+        show_version_string_ = _strip_empty_lines(show_version_output)
         vendor, model, os_version, uptime = self.show_version_sanitizer(show_version_string_)
 
         # processing 'show summary' output
-        configs['running_'] = show_summary_output
-        data = str(configs['running_']).split("\n")
-        non_empty_lines = [line for line in data if line.strip() != ""]
-
-        show_summary_string_ = ""
-        for line in non_empty_lines:
-            show_summary_string_ += line + "\n"
+        show_summary_string_ = _strip_empty_lines(show_summary_output)
         hostname_, fqdn_, serial_number_ = self.show_summary_sanitizer(show_summary_string_)
 
-        return {
+        facts = {
             "hostname": str(hostname_),
             "fqdn": fqdn_,
             "vendor": str(vendor),
@@ -226,75 +528,50 @@ class ArubaFDriver(NetworkDriver):
             "os_version": str(os_version).strip(),
             "uptime": uptime,
         }
+        self._facts_cache = (time.monotonic(), facts)
+        return dict(facts)
 
 
     def get_ping(self):
         """ping"""
-        bad_responses = [
-            "not known", "Name or service not known", "Error", "error",
-             "fail", "Fail", "Destination Host Unreachable", "Destination",
-             "Unreachable", "estination", "reachable", "connect"
-        ]
-
         self.destination = self.hostname
         command = "ping {}".format(self.destination)
-        output = self.device.send_command(command)
+        output = self._send_command(command)
         output = str(output)
 
         ping_dict = {}
-        if output:
-            for i in bad_responses:
-                if i in output:
-                    ping_dict["error"] = "disconnected"
-                    break
-        elif output and len(output) > 10:
+        if _BAD_PING_RE.search(output):
+            ping_dict["error"] = "disconnected"
+        elif len(output) > 10:
             ping_dict["success"] = "connected"
         #return ping_dict
         return output
 
 
-    def get_lldp_neighbors(self):
-        system_name = ""
-        interface_description = ""
-        lldp = {}
-        command = "show ap debug lldp neighbor interface eth0" # for HP SW only
-        result = self.device.send_command(command)
+    def _lldp_eth0(self):
+        """ Collects the eth0 neighbor from 'show ap debug lldp neighbor interface eth0'
+        :returns a tuple with two values (system_name, interface_description)
+        """
 
-        data = [line.strip() for line in result.splitlines()]
-        for line in data:
-            if line:
-                if "System name:" in line:
-                    system_name = line.split()[2]
-                if "Interface description:" in line:
-                    interface_description = line.split()[2].replace(",", "")
-                if line.startswith("HP"):
-                    if "Switch" in line and "revision" in line and "ROM" in line:
-                        vendor = "HP"
-                        #print(line)
-        lldp["eth0"] = [{"hostname": system_name, "port": interface_description}]
+        if self._lldp_cache is not None:
+            cached_at, neighbor = self._lldp_cache
+            if time.monotonic() - cached_at < self._lldp_ttl:
+                return neighbor
 
-        return lldp
+        command = "show ap debug lldp neighbor interface eth0" # for HP SW only
+        result = self._send_command(command)
 
+        system_name = _LLDP_SYSNAME_RE.search(result)
+        interface_description = _LLDP_IFDESC_RE.search(result)
+        neighbor = (system_name.group(1) if system_name else "",
+                    interface_description.group(1) if interface_description else "")
+        self._lldp_cache = (time.monotonic(), neighbor)
+        return neighbor
 
+    def get_lldp_neighbors(self):
+        system_name, interface_description = self._lldp_eth0()
+        return {"eth0": [{"hostname": system_name, "port": interface_description}]}
 
     def get_lldp_neighbors_detail(self, interface="eth0"):
-        system_name = ""
-        interface_description = ""
-        lldp = {}
-        command = "show ap debug lldp neighbor interface eth0" # for HP SW only
-        result = self.device.send_command(command)
-
-        data = [line.strip() for line in result.splitlines()]
-        for line in data:
-            if line:
-                if "System name:" in line:
-                    system_name = line.split()[2]
-                if "Interface description:" in line:
-                    interface_description = line.split()[2].replace(",", "")
-                if line.startswith("HP"):
-                    if "Switch" in line and "revision" in line and "ROM" in line:
-                        vendor = "HP"
-                        #print(line)
-        lldp["eth0"] = [{"hostname": system_name, "port": interface_description}]
-
-        return lldp
+        system_name, interface_description = self._lldp_eth0()
+        return {"eth0": [{"hostname": system_name, "port": interface_description}]}
@@ -0,0 +1,534 @@
+"""Tests for napalm_aruba505.arubaf."""
+
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from napalm_aruba505 import arubaf
+from napalm_aruba505.arubaf import ArubaFDriver
+
+
+SHOW_VERSION = """
+Aruba Operating System Software.
+ArubaOS (MODEL: 505), Version 8.6.0.4-8.6.0.4
+Website: http://www.arubanetworks.com
+(c) Copyright 2020 Hewlett Packard Enterprise Development LP.
+Compiled on 2020-07-08 at 04:05:52 UTC (build 76208) by p4build
+
+AP uptime is 2 weeks 2 days 5 hours 11 minutes 29 seconds
+Reboot Time and Cause: Reboot caused by power cycle
+"""
+
+SHOW_SUMMARY = """
+Name                           :ap505-lab
+System Location                :
+VC IP Address                  :10.1.1.10
+DNSDomain                      :example.com
+Serial Number                  :CNKJ123
+"""
+
+SHOW_LLDP = """
+Interface: eth0
+System name: sw-core-1
+System description: HP J9729A 2920-48G-POE+ Switch, revision WB.16.02, ROM WB.16.01
+Interface description: 1/1/12, Port id: 12
+"""
+
+
+def test_show_version_sanitizer():
+    vendor, model, os_version, uptime = ArubaFDriver.show_version_sanitizer(SHOW_VERSION)
+    assert vendor == "Hewlett Packard"
+    assert model == "ArubaOS (MODEL: 505)"
+    assert os_version.strip() == "Version 8.6.0.4-8.6.0.4"
+    assert uptime == 2 * 604800 + 2 * 86400 + 5 * 3600 + 11 * 60 + 29
+
+
+def test_show_version_sanitizer_empty():
+    assert ArubaFDriver.show_version_sanitizer("") == ("Hewlett Packard", "", "", "")
+
+
+def test_show_version_sanitizer_uptime_without_weeks():
+    data = SHOW_VERSION.replace("2 weeks 2 days", "2 days")
+    assert ArubaFDriver.show_version_sanitizer(data)[3] == 2 * 86400 + 5 * 3600 + 11 * 60 + 29
+
+
+def test_show_summary_sanitizer():
+    assert ArubaFDriver.show_summary_sanitizer(SHOW_SUMMARY) == (
+        "ap505-lab", "ap505-lab.example.com", "CNKJ123")
+
+
+def test_show_summary_sanitizer_empty_dns_domain():
+    data = SHOW_SUMMARY.replace("example.com", "")
+    assert ArubaFDriver.show_summary_sanitizer(data) == ("ap505-lab", "", "CNKJ123")
+
+
+def test_show_summary_sanitizer_empty_serial_number():
+    data = """
+Name                           :ap505-lab
+Serial Number                  :
+DNSDomain                      :example.com
+"""
+    assert ArubaFDriver.show_summary_sanitizer(data) == (
+        "ap505-lab", "ap505-lab.example.com", "")
+
+
+def test_show_summary_sanitizer_crlf():
+    data = "Name :ap1\r\nDNSDomain :ex.com\r\nSerial Number :SN1\r\n"
+    assert ArubaFDriver.show_summary_sanitizer(data) == ("ap1", "ap1.ex.com", "SN1")
+
+
+class _Device:
+    """Answers every command with the same canned output."""
+
+    base_prompt = "ap505-lab"
+
+    def __init__(self, output):
+        self.output = output
+        self.commands = []
+
+    def send_command(self, command, **kwargs):
+        self.commands.append(command)
+        return self.output
+
+
+def _driver(output):
+    driver = ArubaFDriver("ap505-lab", "admin", "admin")
+    driver.device = _Device(output)
+    return driver
+
+
+def test_get_lldp_neighbors():
+    assert _driver(SHOW_LLDP).get_lldp_neighbors() == {
+        "eth0": [{"hostname": "sw-core-1", "port": "1/1/12"}]}
+
+
+def test_get_lldp_neighbors_empty_fields():
+    data = SHOW_LLDP.replace("sw-core-1", "").replace("1/1/12, ", "\n")
+    assert _driver(data).get_lldp_neighbors() == {"eth0": [{"hostname": "", "port": ""}]}
+
+
+class _Transport:
+    """Stands in for the paramiko transport of a session."""
+
+    sock = None
+
+    def __init__(self):
+        self.active = True
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+    def is_active(self):
+        return self.active
+
+
+class _Connection:
+    """Stands in for a netmiko ConnectHandler session."""
+
+    base_prompt = "ap505-lab"
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.connected = True
+        self.remote_conn = SimpleNamespace(transport=_Transport())
+
+    def is_alive(self):
+        return self.connected
+
+    def disconnect(self):
+        self.connected = False
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Makes open() connect with _Connection, yields the connections made."""
+    made = []
+
+    def connect(**kwargs):
+        made.append(_Connection(**kwargs))
+        return made[-1]
+
+    monkeypatch.setattr(arubaf, "ConnectHandler", connect)
+    yield made
+    arubaf.close_pool()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes time.monotonic(), the test moves it with clock[0]."""
+    now = [1000.0]
+    monkeypatch.setattr(arubaf.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _facts_driver(monkeypatch):
+    """Returns a driver answering get_facts from the samples, and its list of calls."""
+    driver = ArubaFDriver("ap505-lab", "admin", "admin", optional_args={"facts_ttl": 30})
+    calls = []
+
+    def send_commands(commands):
+        calls.append(commands)
+        return [SHOW_VERSION, SHOW_SUMMARY]
+
+    monkeypatch.setattr(driver, "_send_commands", send_commands)
+    return driver, calls
+
+
+def test_get_facts_cached_within_ttl(monkeypatch, clock):
+    driver, calls = _facts_driver(monkeypatch)
+    facts = driver.get_facts()
+    assert facts["serial_number"] == "CNKJ123"
+    clock[0] += 29
+    assert driver.get_facts() == facts
+    assert len(calls) == 1
+
+
+def test_get_facts_refetched_after_ttl(monkeypatch, clock):
+    driver, calls = _facts_driver(monkeypatch)
+    driver.get_facts()
+    clock[0] += 30
+    driver.get_facts()
+    assert len(calls) == 2
+
+
+def test_get_facts_returns_a_copy(monkeypatch, clock):
+    driver, calls = _facts_driver(monkeypatch)
+    driver.get_facts()["hostname"] = "changed"
+    assert driver.get_facts()["hostname"] == "ap505-lab"
+    assert len(calls) == 1
+
+
+def test_get_facts_cache_cleared_on_close(monkeypatch, clock):
+    driver, calls = _facts_driver(monkeypatch)
+    driver.get_facts()
+    driver.close()
+    driver.get_facts()
+    assert len(calls) == 2
+
+
+def test_get_facts_cache_cleared_on_open(monkeypatch, clock, connections):
+    driver, calls = _facts_driver(monkeypatch)
+    driver.get_facts()
+    driver.open()
+    driver.get_facts()
+    assert len(calls) == 2
+    driver.close()
+
+
+def test_lldp_neighbors_cached_within_ttl(clock):
+    driver = _driver(SHOW_LLDP)
+    neighbors = driver.get_lldp_neighbors()
+    clock[0] += 14
+    assert driver.get_lldp_neighbors_detail() == neighbors
+    assert len(driver.device.commands) == 1
+
+
+def test_lldp_neighbors_refetched_after_ttl(clock):
+    driver = _driver(SHOW_LLDP)
+    driver.get_lldp_neighbors()
+    clock[0] += 15
+    driver.get_lldp_neighbors()
+    assert len(driver.device.commands) == 2
+
+
+def test_lldp_neighbors_cache_cleared_on_close(clock):
+    driver = _driver(SHOW_LLDP)
+    device = driver.device
+    driver.get_lldp_neighbors()
+    driver.close()
+    driver.device = device
+    driver.get_lldp_neighbors()
+    assert len(device.commands) == 2
+
+
+def _pooled_driver(password="admin", **optional_args):
+    return ArubaFDriver("ap505-lab", "admin", password, optional_args=optional_args)
+
+
+def test_open_reuses_pooled_session(connections):
+    first, second = _pooled_driver(), _pooled_driver()
+    first.open()
+    second.open()
+    assert len(connections) == 1
+    assert first.device is second.device
+    assert first._channel_lock is second._channel_lock
+    first.close()
+    assert connections[0].connected
+    second.close()
+
+
+def test_open_with_other_credentials_does_not_reuse(connections):
+    right, wrong = _pooled_driver("right"), _pooled_driver("WRONG")
+    right.open()
+    wrong.open()
+    assert len(connections) == 2
+    assert connections[1].kwargs["password"] == "WRONG"
+    other_key = _pooled_driver("right", key_file="/tmp/id_rsa")
+    other_key.open()
+    assert len(connections) == 3
+
+
+def test_open_replaces_dead_session_held_by_others(connections):
+    holder, opener = _pooled_driver(), _pooled_driver()
+    holder.open()
+    connections[0].connected = False
+    opener.open()
+    assert len(connections) == 2
+    assert opener.device is connections[1]
+    holder.close()
+    assert connections[1].connected
+    assert arubaf._SESSIONS[opener._session_key].device is connections[1]
+    opener.close()
+
+
+def test_repeated_close_keeps_other_drivers_reference(connections):
+    first, second = _pooled_driver(), _pooled_driver()
+    first.open()
+    second.open()
+    first.close()
+    first.close()
+    assert arubaf._SESSIONS[second._session_key].refs == 1
+    assert connections[0].connected
+    assert first.is_alive() == {'is_alive': False}
+    second.close()
+
+
+def test_idle_session_reaped_after_timeout(connections):
+    driver = _pooled_driver(session_idle_timeout=0.01)
+    driver.open()
+    session = driver._session
+    driver.close()
+    session.idle_timer.join(5)
+    assert not connections[0].connected
+    assert driver._session_key not in arubaf._SESSIONS
+
+
+def test_reopen_cancels_idle_timer(connections):
+    driver = _pooled_driver(session_idle_timeout=60)
+    driver.open()
+    session = driver._session
+    driver.close()
+    timer = session.idle_timer
+    driver.open()
+    timer.join(5)
+    assert not timer.is_alive()
+    assert session.idle_timer is None
+    assert len(connections) == 1
+    assert connections[0].connected
+    driver.close()
+
+
+def test_idle_timeout_comes_from_the_session(connections):
+    opener, closer = _pooled_driver(session_idle_timeout=0), _pooled_driver(session_idle_timeout=60)
+    opener.open()
+    closer.open()
+    opener.close()
+    closer.close()
+    assert not connections[0].connected
+
+
+def test_close_pool_cancels_idle_timers(connections):
+    driver = _pooled_driver(session_idle_timeout=60)
+    driver.open()
+    session = driver._session
+    driver.close()
+    arubaf.close_pool()
+    session.idle_timer.join(5)
+    assert not session.idle_timer.is_alive()
+    assert not connections[0].connected
+    assert arubaf._SESSIONS == {}
+
+
+class _Shell(_Connection):
+    """A _Connection whose channel is backed by a pipe and answers from a script.
+
+    respond(commands) returns the bytes the device sends back for a batched write,
+    recv() hands them out at most chunk bytes at a time.
+    """
+
+    def __init__(self, respond, chunk=65536, outputs=None):
+        super().__init__()
+        self.respond = respond
+        self.chunk = chunk
+        self.outputs = outputs or {}
+        self.written = []
+        self.sent = []
+        self.transport = _Transport()
+        self.remote_conn = self
+        self._read_fd, self._write_fd = os.pipe()
+
+    def fileno(self):
+        return self._read_fd
+
+    def recv(self, size):
+        return os.read(self._read_fd, min(size, self.chunk))
+
+    def clear_buffer(self):
+        pass
+
+    def write_channel(self, data):
+        self.written.append(data)
+        os.write(self._write_fd, self.respond(data.split("\n")[:-1]))
+
+    def end_of_file(self):
+        os.close(self._write_fd)
+        self._write_fd = None
+
+    def send_command(self, command, **kwargs):
+        self.sent.append(command)
+        return self.outputs[command]
+
+    def normalize_linefeeds(self, output):
+        return output.replace("\r\n", "\n")
+
+    def strip_command(self, command, output):
+        return "\n".join(output.split("\n")[1:])
+
+    def disconnect(self):
+        super().disconnect()
+        for fd in (self._read_fd, self._write_fd):
+            if fd is not None:
+                os.close(fd)
+        self._read_fd = self._write_fd = None
+
+
+BATCH_OUTPUTS = {"show version": SHOW_VERSION, "show summary": SHOW_SUMMARY}
+
+
+def _echo(commands):
+    """Answers every command, each output ends with the prompt the next command is echoed on."""
+    data = ""
+    for command in commands:
+        data += command + "\r\n" + BATCH_OUTPUTS[command].replace("\n", "\r\n") + "\r\nap505-lab# "
+    return data.encode()
+
+
+@pytest.fixture
+def shell(monkeypatch):
+    """Opens a driver on a _Shell, the test sets its respond script and chunk size."""
+    device = _Shell(_echo, outputs=BATCH_OUTPUTS)
+    monkeypatch.setattr(arubaf, "ConnectHandler", lambda **kwargs: device)
+    driver = ArubaFDriver("ap505-lab", "admin", "admin", timeout=5)
+    driver.open()
+    yield driver, device
+    driver.close()
+    arubaf.close_pool()
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 5, 17, 100, 65536])
+def test_send_commands_splits_batched_output(shell, chunk):
+    driver, device = shell
+    device.chunk = chunk
+    outputs = driver._send_commands(["show version", "show summary"])
+    assert [o.strip() for o in outputs] == [SHOW_VERSION.strip(), SHOW_SUMMARY.strip()]
+    assert device.written == ["show version\nshow summary\n"]
+    assert device.sent == []
+
+
+def test_send_commands_falls_back_when_type_ahead_dropped(shell, monkeypatch):
+    driver, device = shell
+    monkeypatch.setattr(arubaf, "_TYPEAHEAD_WAIT", 0.05)
+    device.respond = lambda commands: _echo(commands[:1])
+    outputs = driver._send_commands(["show version", "show summary"])
+    assert outputs[0].strip() == SHOW_VERSION.strip()
+    assert outputs[1] == SHOW_SUMMARY
+    assert device.sent == ["show summary"]
+    assert not driver._session.batch_commands
+
+    # Other drivers on the same session don't batch either
+    other = ArubaFDriver("ap505-lab", "admin", "admin")
+    other.open()
+    other._send_commands(["show version", "show summary"])
+    assert len(device.written) == 1
+    assert device.sent == ["show summary", "show version", "show summary"]
+    other.close()
+
+
+def test_send_commands_times_out_without_prompt(shell):
+    driver, device = shell
+    driver.timeout = 0.05
+    device.respond = lambda commands: b"show version\r\nArubaOS (MODEL: 505)"
+    with pytest.raises(arubaf.CommandTimeoutException):
+        driver._send_commands(["show version", "show summary"])
+    assert driver._session.batch_commands
+    assert device.sent == []
+
+
+def test_send_commands_channel_closed(shell):
+    driver, device = shell
+    device.respond = lambda commands: b"show version\r\n"
+    original_write = device.write_channel
+
+    def write_then_close(data):
+        original_write(data)
+        device.end_of_file()
+
+    device.write_channel = write_then_close
+    with pytest.raises(EOFError):
+        driver._send_commands(["show version", "show summary"])
+
+
+def test_keepalive_defaults_to_15_seconds(connections):
+    driver = _pooled_driver()
+    driver.open()
+    assert connections[0].remote_conn.transport.keepalive == 15
+    driver.close()
+
+
+def test_keepalive_zero_disables_keepalives(connections):
+    driver = _pooled_driver(keepalive=0)
+    driver.open()
+    assert connections[0].kwargs["keepalive"] == 0
+    assert not hasattr(connections[0].remote_conn.transport, "keepalive")
+    driver.close()
+
+
+class _ExecChannel:
+    """Stands in for a paramiko exec channel, answering from BATCH_OUTPUTS."""
+
+    def __init__(self, status=0, empty=False):
+        self.status = status
+        self.empty = empty
+
+    def settimeout(self, timeout):
+        pass
+
+    def exec_command(self, command):
+        self.command = command
+
+    def makefile(self, mode):
+        return io.BytesIO(b"" if self.empty else BATCH_OUTPUTS[self.command].encode())
+
+    def makefile_stderr(self, mode):
+        return io.BytesIO(b"" if self.status == 0 else b"Invalid input")
+
+    def recv_exit_status(self):
+        return self.status
+
+    def close(self):
+        pass
+
+
+def _exec_driver(shell, **channel_args):
+    driver, device = shell
+    driver._exec_channels = True
+    transport = SimpleNamespace(open_session=lambda timeout=None: _ExecChannel(**channel_args))
+    device.get_transport = lambda: transport
+    return driver, device
+
+
+def test_get_facts_over_exec_channels(shell):
+    driver, device = _exec_driver(shell)
+    assert driver.get_facts()["serial_number"] == "CNKJ123"
+    assert device.written == []
+    assert driver._exec_channels
+
+
+@pytest.mark.parametrize("channel_args", [{"status": 1}, {"empty": True}])
+def test_exec_channels_fall_back_to_the_shell(shell, channel_args):
+    driver, device = _exec_driver(shell, **channel_args)
+    assert driver.get_facts()["serial_number"] == "CNKJ123"
+    assert device.written == ["show version\nshow summary\n"]
+    assert not driver._exec_channels